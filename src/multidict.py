@@ -0,0 +1,140 @@
+"""Case-insensitive multi-valued dictionaries, used for headers, query arguments and forms."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+
+class MultiDict(dict):
+    """
+    Support for multipart forms. Depends on [python-multipart](https://pypi.org/project/python-multipart/).
+
+    E.g.
+
+    ```python
+    from multipart.multipart import FormParser, parse_options_header
+    from multipart.exceptions import FormParserError
+    from uhttp import Application, MultiDict, Response
+
+    app = Application()
+
+    def parse_form(request):
+        form = MultiDict()
+
+        def on_field(field):
+            form[field.field_name.decode()] = field.value.decode()
+        def on_file(file):
+            if file.field_name:
+                form[file.field_name.decode()] = file.file_object
+        content_type, options = parse_options_header(
+            request.headers.get('content-type', '')
+        )
+        try:
+            parser = FormParser(
+                content_type.decode(),
+                on_field,
+                on_file,
+                boundary=options.get(b'boundary'),
+                config={'MAX_MEMORY_FILE_SIZE': float('inf')}  # app._max_content
+            )
+            parser.write(request.body)
+            parser.finalize()
+        except FormParserError:
+            raise Response(400)
+        return form
+
+    @app.before
+    def handle_multipart(request):
+        if 'multipart/form-data' in request.headers.get('content-type'):
+            request.form = parse_form(request)
+    ```
+    """
+
+    def __init__(
+        self,
+        mapping: Union[
+            None, "MultiDict", Dict[str, Any], Iterable[tuple[str, Any]]
+        ] = None,
+    ) -> None:
+        if mapping is None:
+            super().__init__()
+        elif isinstance(mapping, MultiDict):
+            super().__init__({k.lower(): v[:] for k, v in mapping.items()})
+        elif isinstance(mapping, dict):
+            super().__init__(
+                {
+                    k.lower(): [v] if not isinstance(v, list) else v[:]
+                    for k, v in mapping.items()
+                }
+            )
+        elif isinstance(mapping, (tuple, list)):
+            super().__init__()
+            for key, value in mapping:
+                self._setdefault(key.lower(), []).append(value)
+        else:
+            raise TypeError("Invalid mapping type")
+
+    @classmethod
+    def _from_pairs(cls, pairs: Iterable[tuple[str, Any]]) -> MultiDict:
+        """Builds a MultiDict from key-value pairs, skipping the `__init__` type dispatch."""
+        self = cls()
+        setdefault = dict.setdefault
+        for key, value in pairs:
+            setdefault(self, key.lower(), []).append(value)
+        return self
+
+    # Keys are stored lowercased, so lookups try the key as given before lowering it.
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return dict.__getitem__(self, key)[-1]
+        except KeyError:
+            return dict.__getitem__(self, key.lower())[-1]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().setdefault(key.lower(), []).append(value)
+
+    def _get(self, key: str, default: tuple[Any, ...] = (None,)) -> List[Any]:
+        return super().get(key.lower(), list(default))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        values = dict.get(self, key)
+        if values is None:
+            values = dict.get(self, key.lower(), [default])
+        return values[-1]
+
+    def _items(self) -> Iterable[tuple[str, List[Any]]]:
+        return super().items()
+
+    def items(self) -> Iterable[tuple[str, Any]]:
+        return ((k.lower(), v[-1]) for k, v in super().items())
+
+    def _pop(self, key: str, default: tuple[Any, ...] = (None,)) -> Any:
+        return super().pop(key.lower(), list(default))
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        values: Optional[List] = super().get(key.lower(), [])
+        if len(values) > 1:
+            return values.pop()
+        else:
+            return super().pop(key.lower(), default)
+
+    def _setdefault(self, key: str, default: tuple[Any, ...] = (None,)) -> List[Any]:
+        return super().setdefault(key.lower(), list(default))
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        return super().setdefault(key.lower(), [default])[-1]
+
+    def _values(self) -> Iterable[List[Any]]:
+        return super().values()
+
+    def values(self) -> Iterable[Any]:
+        return (v[-1] for v in super().values())
+
+    def _update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        new = {}
+        new.update(*args, **kwargs)
+        super().update(MultiDict(new))
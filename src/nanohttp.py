@@ -4,10 +4,10 @@ from __future__ import annotations
 
 import json
 import re
-from ast import Tuple
 from asyncio import to_thread
+from collections import ChainMap
+from functools import wraps
 from http import HTTPMethod, HTTPStatus
-from http.cookies import CookieError, SimpleCookie
 from inspect import iscoroutinefunction
 from typing import (
     Annotated,
@@ -15,23 +15,46 @@ from typing import (
     Awaitable,
     Callable,
     Dict,
-    Iterable,
     List,
+    Match,
     Optional,
+    Pattern,
     TypeVar,
     Union,
 )
-from urllib.parse import parse_qs, unquote
+from urllib.parse import parse_qs
 
 from typing_extensions import Doc
 
 from src.enums import MediaType, RequestEncodingType
+from src.multidict import MultiDict
 from src.request import Request
-from src.response import Response
+from src.response import Response, _loads
 
 AppType = TypeVar("AppType", bound="uHTTP")  # type: ignore
 RouteHandler = Union[Callable[..., None], Callable[..., Awaitable[None]]]
-Routes = Dict[str, Dict[HTTPMethod, RouteHandler]]
+Methods = Dict[HTTPMethod, RouteHandler]
+Routes = Dict[str, Methods]
+
+# Bodies below this size are parsed inline, a thread hop would cost more than the parse.
+_THREAD_THRESHOLD = 64 * 1024
+
+# Methods whose requests rarely carry a body, not read unless the headers announce one.
+_BODILESS_METHODS = frozenset(
+    (HTTPMethod.GET, HTTPMethod.HEAD, HTTPMethod.DELETE, HTTPMethod.OPTIONS)
+)
+
+# Encoded header names, seeded with the ones nanohttp sends itself and filled as
+# responses are sent up to a fixed size.
+_HEADER_NAMES: Dict[str, bytes] = {
+    name: name.encode() for name in ("content-type", "set-cookie", "allow")
+}
+_HEADER_NAMES_SIZE = 256
+
+# Characters that make a path pattern more than a literal string.
+_METACHARS = frozenset(".^$*+?{}[]\\|()")
+# Numbered references break once patterns are nested in a combined alternation.
+_NUMBERED_REFERENCE = re.compile(r"\\[1-9]|\(\?\(")
 
 
 class Application:
@@ -108,15 +131,32 @@ class Application:
             Optional[List[RouteHandler]],
             Doc("""List of functions to be called after a response is made."""),
         ] = None,
-        serializer: Annotated[Callable, Doc("")] = json.dumps,
+        serializer: Annotated[
+            Optional[Callable],
+            Doc(
+                """Callable used to serialize `dict` responses. Defaults to `orjson.dumps` if installed, otherwise `json.dumps`.
+                With orjson, `NaN` and infinities are sent as `null`, and JSON request bodies are parsed by
+                `orjson.loads`, which reads integers past 64 bits as floats, losing precision."""
+            ),
+        ] = None,
         max_content: int = 1048576,
     ) -> None:
-        self._routes = routes or {}
+        self._routes: List[tuple[Pattern, Methods]] = []
+        self._by_pattern: Dict[str, Methods] = {}
+        self._static: Dict[str, Methods] = {}
+        self._dynamic: Dict[str, List[tuple[int, Pattern, Methods]]] = {}
+        self._patterns: List[tuple[int, Pattern, Methods]] = []
+        for path, methods in (routes or {}).items():
+            self._methods(path).update(
+                {method: coroutine(func) for method, func in methods.items()}
+            )
         self._startup = startup or []
         self._shutdown = shutdown or []
         self._before = before or []
         self._after = after or []
-        self._serializer = serializer
+        self._before_stages = pipeline(self._before)
+        self._after_stages = pipeline(self._after)
+        self._serializer = serializer or Response._default_dumps
         self._max_content = max_content
 
     def mount(self, app: Application, prefix: Optional[str] = "") -> None:
@@ -137,7 +177,12 @@ class Application:
         self._shutdown += app._shutdown
         self._before += app._before
         self._after += app._after
-        self._routes.update({prefix + k: v for k, v in app._routes.items()})
+        self._before_stages = pipeline(self._before)
+        self._after_stages = pipeline(self._after)
+        for route, methods in app._routes:
+            if prefix:
+                route = re.compile(prefix + route.pattern)
+            self._methods(route).update(methods)
         self._max_content = max(self._max_content, app._max_content)
 
     def startup(self, func: Callable) -> Callable:
@@ -199,6 +244,7 @@ class Application:
         ```
         """
         self._before.append(func)
+        self._before_stages = pipeline(self._before)
         return func
 
     def after(self, func: Callable) -> Callable:
@@ -219,10 +265,11 @@ class Application:
         ```
         """
         self._after.append(func)
+        self._after_stages = pipeline(self._after)
         return func
 
     def route(
-        self, path: str, methods: Tuple[HTTPMethod] = (HTTPMethod.GET,)
+        self, path: str, methods: tuple[HTTPMethod, ...] = (HTTPMethod.GET,)
     ) -> Callable:
         """
         Inserts the decorated function to the routing table.
@@ -232,7 +279,9 @@ class Application:
         [async] def func(request)
         ```
 
-        Paths are compiled at startup as regular expression patterns. Named groups define path parameters.
+        Paths are compiled on registration as regular expression patterns. Named groups define path parameters.
+
+        Literal paths are looked up before patterns, which are tried in registration order.
 
         If the request path doesn't match any route pattern, a `404 Not Found` response is returned.
 
@@ -255,13 +304,136 @@ class Application:
         """
 
         def decorator(func):
-            self._routes.setdefault(path, {}).update(
-                {method: func for method in methods}
-            )
+            self._methods(path).update({method: coroutine(func) for method in methods})
             return func
 
         return decorator
 
+    def _methods(self, route: Union[str, Pattern]) -> Methods:
+        """Returns the methods table of a route, compiling and indexing it if new."""
+        pattern = route if isinstance(route, str) else route.pattern
+        if (methods := self._by_pattern.get(pattern)) is not None:
+            return methods
+        compiled, methods = re.compile(route), {}
+        self._index(len(self._routes), compiled, methods)
+        self._routes.append((compiled, methods))
+        self._by_pattern[pattern] = methods
+        return methods
+
+    def _index(self, index: int, route: Pattern, methods: Methods) -> None:
+        """
+        Files a route in the dispatch tables.
+
+        Literal paths go to a hash table, patterns starting with a literal segment
+        (e.g. `/users/(?P<id>\\d+)`) to a bucket keyed by that segment, and anything
+        else to a single alternation of named groups.
+        """
+        pattern = route.pattern
+        segment, _, rest = pattern[1:].partition("/")
+        if _METACHARS.isdisjoint(pattern):
+            self._static.setdefault(pattern, methods)
+        elif (
+            pattern.startswith("/")
+            and "|" not in pattern
+            and _METACHARS.isdisjoint(segment)
+            and rest[:1] not in ("*", "?", "{")
+        ):
+            self._dynamic.setdefault(segment, []).append((index, route, methods))
+        else:
+            self._patterns.append((index, route, methods))
+        # Drop the compiled router, the class level `_match` rebuilds it when needed.
+        self.__dict__.pop("_match", None)
+
+    def _compile_router(self) -> None:
+        """
+        Generates `self._match`, a function specialised for the current dispatch tables.
+
+        Empty tables emit no code, every bucket becomes a straight run of
+        `fullmatch` calls, and patterns outside buckets are tried through the
+        combined alternation when they can be nested in one.
+        """
+        namespace: Dict[str, Any] = {"_static": self._static.get}
+        lines: List[str] = []
+
+        for b, routes in enumerate(self._dynamic.values()):
+            lines.append(f"def _b{b}(path):")
+            for index, route, methods in routes:
+                namespace[f"_r{index}"] = route.fullmatch
+                namespace[f"_m{index}"] = methods
+                lines += [
+                    f"    if matches := _r{index}(path):",
+                    f"        return {index}, _m{index}, matches",
+                ]
+        buckets = ", ".join(f"{s!r}: _b{b}" for b, s in enumerate(self._dynamic))
+        lines.append(f"_buckets = {{{buckets}}}.get")
+        namespace["_nothing"] = lambda path: None
+
+        combined = None
+        if self._patterns and not any(
+            _NUMBERED_REFERENCE.search(p.pattern) for _, p, _ in self._patterns
+        ):
+            try:
+                combined = re.compile(
+                    "|".join(f"(?P<r{i}>{p.pattern})" for i, p, _ in self._patterns)
+                )
+            except re.error:
+                pass
+
+        lines.append("def _match(path):")
+        if self._static:
+            lines += [
+                "    if (methods := _static(path)) is not None:",
+                "        return methods, None",
+            ]
+        if self._dynamic:
+            lines.append(
+                '    found = _buckets(path[1:].partition("/")[0], _nothing)(path)'
+            )
+        if combined is not None:
+            namespace["_combined"] = combined.fullmatch
+            namespace["_groups"] = {
+                f"r{i}": (i, p.fullmatch, m) for i, p, m in self._patterns
+            }
+            lines += [
+                "    if matches := _combined(path):",
+                "        index, route, methods = _groups[matches.lastgroup]",
+            ]
+            if self._dynamic:
+                lines += [
+                    "        if found is None or index < found[0]:",
+                    "            return methods, route(path)",
+                ]
+            else:
+                lines.append("        return methods, route(path)")
+        else:
+            for index, route, methods in self._patterns:
+                namespace[f"_r{index}"] = route.fullmatch
+                namespace[f"_m{index}"] = methods
+                guard = ""
+                if self._dynamic:
+                    guard = f"(found is None or found[0] > {index}) and "
+                lines += [
+                    f"    if {guard}(matches := _r{index}(path)):",
+                    f"        return _m{index}, matches",
+                ]
+        if self._dynamic:
+            lines.append("    return None if found is None else found[1:]")
+        else:
+            lines.append("    return None")
+
+        exec("\n".join(lines), namespace)
+        self._match = namespace["_match"]
+
+    def _match(self, path: str) -> Optional[tuple[Methods, Optional[Match]]]:
+        """
+        Finds the methods table and the pattern match (if any) for a path.
+
+        Only called before the router is compiled, after which the generated
+        function shadows it on the instance.
+        """
+        self._compile_router()
+        return self._match(path)
+
     def get(self, path: str) -> Callable:
         return self.route(path, methods=(HTTPMethod.GET,))
 
@@ -300,9 +472,7 @@ class Application:
                     try:
                         for func in self._startup:
                             await asyncfy(func, state)
-                        self._routes = {
-                            re.compile(k): v for k, v in self._routes.items()
-                        }
+                        self._compile_router()
                     except Exception as e:
                         await send(
                             {
@@ -333,58 +503,68 @@ class Application:
                 method=scope["method"],
                 path=scope["path"],
                 ip=scope.get("client", ("", 0))[0],
-                args=parse_qs(unquote(scope["query_string"])),
-                state=state.copy(),
+                args=parse_qs(scope["query_string"].decode("utf-8", "replace")),
+                state=ChainMap({}, state),
             )
 
             try:
-                try:
-                    request.headers = MultiDict(
-                        [[k.decode(), v.decode()] for k, v in scope["headers"]]
-                    )
-                except UnicodeDecodeError:
-                    raise Response(HTTPStatus.BAD_REQUEST)
+                request.headers = MultiDict._from_pairs(
+                    (k.decode("latin-1"), v.decode("latin-1"))
+                    for k, v in scope["headers"]
+                )
+
+                request.cookies = parse_cookies(request.headers.get("cookie", ""))
 
                 try:
-                    request.cookies.load(request.headers.get("cookie", ""))
-                except CookieError:
+                    length = int(request.headers.get("content-length") or 0)
+                except ValueError:
                     raise Response(HTTPStatus.BAD_REQUEST)
-
-                while True:
-                    event = await receive()
-                    request.body += event["body"]
-                    if len(request.body) > self._max_content:
-                        raise Response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
-                    if not event["more_body"]:
-                        break
+                if length < 0:
+                    raise Response(HTTPStatus.BAD_REQUEST)
+                if length > self._max_content:
+                    raise Response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+                if (
+                    length
+                    or request.method not in _BODILESS_METHODS
+                    or "transfer-encoding" in request.headers
+                ):
+                    chunks: List[bytes] = []
+                    size = 0
+                    while True:
+                        event = await receive()
+                        chunks.append(event["body"])
+                        size += len(event["body"])
+                        if size > self._max_content:
+                            raise Response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+                        if not event["more_body"]:
+                            break
+                    request.body = b"".join(chunks)
 
                 content_type = request.headers.get("content-type", "")
                 if MediaType.JSON in content_type:
                     try:
-                        request.json = await to_thread(
-                            json.loads, request.body.decode()
-                        )
+                        request.json = await parse(_loads, request.body)
                     except (UnicodeDecodeError, json.JSONDecodeError):
                         raise Response(HTTPStatus.BAD_REQUEST)
                 elif RequestEncodingType.URL_ENCODED in content_type:
                     request.form = MultiDict(
-                        await to_thread(parse_qs, unquote(request.body))
+                        await parse(parse_qs, request.body.decode("utf-8", "replace"))
                     )
 
-                for func in self._before:
-                    if ret := await asyncfy(func, request):
-                        raise Response.from_any(ret)
+                if ret := await run_pipeline(self._before_stages, request):
+                    raise Response.from_any(ret, self._serializer)
 
-                for route, methods in self._routes.items():
-                    if matches := route.fullmatch(request.path):
+                if found := self._match(request.path):
+                    methods, matches = found
+                    if matches is not None:
                         request.params = matches.groupdict()
-                        if func := methods.get(request.method):
-                            ret = await asyncfy(func, request)
-                            response = Response.from_any(ret)
-                        else:
-                            response = Response(HTTPStatus.METHOD_NOT_ALLOWED)
-                            response.headers["allow"] = ", ".join(methods)
-                        break
+                    if func := methods.get(request.method):
+                        ret = await func(request)
+                        response = Response.from_any(ret, self._serializer)
+                    else:
+                        response = Response(HTTPStatus.METHOD_NOT_ALLOWED)
+                        response.headers["allow"] = ", ".join(methods)
                 else:
                     response = Response(HTTPStatus.NOT_FOUND)
 
@@ -392,31 +572,25 @@ class Application:
                 response = early_response
 
             try:
-                for func in self._after:
-                    if ret := await asyncfy(func, request, response):
-                        raise Response.from_any(ret)
+                if ret := await run_pipeline(self._after_stages, request, response):
+                    raise Response.from_any(ret, self._serializer)
             except Response as early_response:
                 response = early_response
 
-            response.headers.setdefault("content-length", len(response.body))
-            response.headers._update(
-                {
-                    "set-cookie": [
-                        header.split(": ", maxsplit=1)[1]
-                        for header in response.cookies.output().splitlines()
-                    ]
-                }
-            )
+            headers = encode_headers(response.headers)
+            if response._cookies:
+                headers.extend(
+                    (b"set-cookie", morsel.OutputString().encode())
+                    for morsel in response._cookies.values()
+                )
+            if "content-length" not in response.headers:
+                headers.append((b"content-length", b"%d" % len(response.body)))
 
             await send(
                 {
                     "type": "http.response.start",
                     "status": response.status,
-                    "headers": [
-                        [str(k).encode(), str(v).encode()]
-                        for k, l in response.headers._items()
-                        for v in l
-                    ],
+                    "headers": headers,
                 }
             )
             await send({"type": "http.response.body", "body": response.body})
@@ -432,119 +606,83 @@ async def asyncfy(func, /, *args, **kwargs):
         return await to_thread(func, *args, **kwargs)
 
 
-class MultiDict(dict):
-    """
-    Support for multipart forms. Depends on [python-multipart](https://pypi.org/project/python-multipart/).
-
-    E.g.
-
-    ```python
-    from multipart.multipart import FormParser, parse_options_header
-    from multipart.exceptions import FormParserError
-    from uhttp import Application, MultiDict, Response
-
-    app = Application()
-
-    def parse_form(request):
-        form = MultiDict()
-
-        def on_field(field):
-            form[field.field_name.decode()] = field.value.decode()
-        def on_file(file):
-            if file.field_name:
-                form[file.field_name.decode()] = file.file_object
-        content_type, options = parse_options_header(
-            request.headers.get('content-type', '')
-        )
-        try:
-            parser = FormParser(
-                content_type.decode(),
-                on_field,
-                on_file,
-                boundary=options.get(b'boundary'),
-                config={'MAX_MEMORY_FILE_SIZE': float('inf')}  # app._max_content
-            )
-            parser.write(request.body)
-            parser.finalize()
-        except FormParserError:
-            raise Response(400)
-        return form
-
-    @app.before
-    def handle_multipart(request):
-        if 'multipart/form-data' in request.headers.get('content-type'):
-            request.form = parse_form(request)
-    ```
-    """
-
-    def __init__(
-        self,
-        mapping: Union[
-            None, "MultiDict", Dict[str, Any], Iterable[Tuple[str, Any]]
-        ] = None,
-    ) -> None:
-        if mapping is None:
-            super().__init__()
-        elif isinstance(mapping, MultiDict):
-            super().__init__({k.lower(): v[:] for k, v in mapping.items()})
-        elif isinstance(mapping, dict):
-            super().__init__(
-                {
-                    k.lower(): [v] if not isinstance(v, list) else v[:]
-                    for k, v in mapping.items()
-                }
-            )
-        elif isinstance(mapping, (tuple, list)):
-            super().__init__()
-            for key, value in mapping:
-                self._setdefault(key.lower(), []).append(value)
-        else:
-            raise TypeError("Invalid mapping type")
-
-    def __getitem__(self, key: str) -> Any:
-        return super().__getitem__(key.lower())[-1]
-
-    def __setitem__(self, key: str, value: Any) -> None:
-        super().setdefault(key.lower(), []).append(value)
-
-    def _get(self, key: str, default: Tuple[Any, ...] = (None,)) -> List[Any]:
-        return super().get(key.lower(), list(default))
-
-    def get(self, key: str, default: Any = None) -> Any:
-        return super().get(key.lower(), [default])[-1]
+def coroutine(func: Callable) -> Callable[..., Awaitable]:
+    """Returns `func` as a coroutine function, sync functions are run in a thread."""
+    if iscoroutinefunction(func):
+        return func
 
-    def _items(self) -> Iterable[Tuple[str, List[Any]]]:
-        return super().items()
+    @wraps(func, updated=())
+    async def run_in_thread(*args, **kwargs):
+        return await to_thread(func, *args, **kwargs)
 
-    def items(self) -> Iterable[Tuple[str, Any]]:
-        return ((k.lower(), v[-1]) for k, v in super().items())
+    return run_in_thread
 
-    def _pop(self, key: str, default: Tuple[Any, ...] = (None,)) -> Any:
-        return super().pop(key.lower(), list(default))
 
-    def pop(self, key: str, default: Any = None) -> Any:
-        values: Optional[List] = super().get(key.lower(), [])
-        if len(values) > 1:
-            return values.pop()
+def pipeline(funcs: List[Callable]) -> List[Union[Callable, List[Callable]]]:
+    """Groups consecutive sync functions into lists, each run in a single thread hop."""
+    stages = []
+    for func in funcs:
+        if iscoroutinefunction(func):
+            stages.append(func)
+        elif stages and isinstance(stages[-1], list):
+            stages[-1].append(func)
         else:
-            return super().pop(key.lower(), default)
+            stages.append([func])
+    return stages
 
-    def _setdefault(self, key: str, default: Tuple[Any, ...] = (None,)) -> List[Any]:
-        return super().setdefault(key.lower(), list(default))
 
-    def setdefault(self, key: str, default: Any = None) -> Any:
-        return super().setdefault(key.lower(), [default])[-1]
+async def run_pipeline(stages, /, *args):
+    for stage in stages:
+        if isinstance(stage, list):
+            ret = await to_thread(run_sync, stage, *args)
+        else:
+            ret = await stage(*args)
+        if ret:
+            return ret
 
-    def _values(self) -> Iterable[List[Any]]:
-        return super().values()
 
-    def values(self) -> Iterable[Any]:
-        return (v[-1] for v in super().values())
+def run_sync(funcs, /, *args):
+    for func in funcs:
+        if ret := func(*args):
+            return ret
 
-    def _update(self, *args: Any, **kwargs: Any) -> None:
-        super().update(*args, **kwargs)
 
-    def update(self, *args: Any, **kwargs: Any) -> None:
-        new = {}
-        new.update(*args, **kwargs)
-        super().update(MultiDict(new))
+async def parse(func, data, /):
+    if len(data) < _THREAD_THRESHOLD:
+        return func(data)
+    else:
+        return await to_thread(func, data)
+
+
+def parse_cookies(header: str) -> Dict[str, str]:
+    cookies = {}
+    for pair in header.split(";"):
+        name, sep, value = pair.partition("=")
+        if sep:
+            value = value.strip()
+            if len(value) > 1 and value[0] == value[-1] == '"':
+                value = value[1:-1]
+            if not value.isascii():
+                # Headers are decoded as latin-1, browsers send cookie values as UTF-8.
+                value = value.encode("latin-1").decode("utf-8", "replace")
+            cookies[name.strip()] = value
+    return cookies
+
+
+def encode_headers(headers: MultiDict) -> List[tuple[bytes, bytes]]:
+    encoded = []
+    for name, values in headers._items():
+        if (name_bytes := _HEADER_NAMES.get(name)) is None:
+            name_bytes = name.encode("latin-1")
+            if len(_HEADER_NAMES) < _HEADER_NAMES_SIZE:
+                _HEADER_NAMES[name] = name_bytes
+        for value in values:
+            if isinstance(value, str):
+                encoded.append((name_bytes, value.encode()))
+            elif isinstance(value, (bytes, bytearray)):
+                encoded.append((name_bytes, value))
+            elif type(value) is int:
+                encoded.append((name_bytes, b"%d" % value))
+            else:
+                encoded.append((name_bytes, str(value).encode()))
+    return encoded
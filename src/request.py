@@ -1,14 +1,26 @@
 from http import HTTPMethod
-from http.cookies import SimpleCookie
-from typing import Annotated, Dict, Optional
+from typing import Annotated, Any, Dict, MutableMapping, Optional
 
 from typing_extensions import Doc
 
-from src.nanohttp import MultiDict
+from src.multidict import MultiDict
+
+
+def _multidict(mapping: Any) -> Optional[MultiDict]:
+    if isinstance(mapping, MultiDict):
+        return mapping
+    return MultiDict(mapping) if mapping else None
 
 
 class Request:
-    """An HTTP request. Created every time the application is called on the HTTP protocol with a shallow copy of the state."""
+    """
+    An HTTP request. Created every time the application is called on the HTTP protocol with a copy-on-write view of the state.
+
+    `request.state` is a `collections.ChainMap` over the lifespan state: reads fall through to it,
+    while writes and deletions only touch the request's own layer. Keys set by lifespan functions
+    therefore can't be removed from a request, `del request.state[key]` raises `KeyError` and
+    `request.state.pop(key, None)` returns `None`; overwrite them instead.
+    """
 
     def __init__(
         self,
@@ -41,19 +53,19 @@ class Request:
         args: Annotated[
             Optional[Dict],
             Doc(
-                "Arguments passed with the request, typically in the form of key-value pairs. Defaults to an empty MultiDict if not provided."
+                "Arguments passed with the request, typically in the form of key-value pairs. Defaults to an empty MultiDict, created on first access, if not provided."
             ),
         ] = None,
         headers: Annotated[
             Optional[MultiDict],
             Doc(
-                "HTTP headers sent with the request. Defaults to an empty MultiDict if not provided."
+                "HTTP headers sent with the request. Defaults to an empty MultiDict, created on first access, if not provided."
             ),
         ] = None,
         cookies: Annotated[
-            Optional[SimpleCookie],
+            Optional[Dict[str, str]],
             Doc(
-                "Cookies sent with the request. Defaults to an empty SimpleCookie if not provided."
+                "Cookies sent with the request, by name. Defaults to an empty dictionary if not provided."
             ),
         ] = None,
         body: Annotated[
@@ -71,11 +83,11 @@ class Request:
         form: Annotated[
             MultiDict,
             Doc(
-                "Form data sent with the request. Defaults to an empty MultiDict if not provided."
+                "Form data sent with the request. Defaults to an empty MultiDict, created on first access, if not provided."
             ),
         ] = None,
         state: Annotated[
-            Optional[Dict],
+            Optional[MutableMapping],
             Doc(
                 "State associated with the request. Defaults to an empty dictionary if not provided."
             ),
@@ -85,13 +97,44 @@ class Request:
         self.path = path
         self.ip = ip
         self.params = params or {}
-        self.args = MultiDict(args)
-        self.headers = MultiDict(headers)
-        self.cookies = SimpleCookie(cookies)
+        self._args = _multidict(args)
+        self._headers = _multidict(headers)
+        self.cookies = cookies or {}
         self.body = body
         self.json = json
-        self.form = MultiDict(form)
-        self.state = state or {}
+        self._form = _multidict(form)
+        self.state = state if state is not None else {}
+
+    # Fields left empty are only allocated when a request actually reads or writes them.
+    @property
+    def args(self) -> MultiDict:
+        if self._args is None:
+            self._args = MultiDict()
+        return self._args
+
+    @args.setter
+    def args(self, args: MultiDict) -> None:
+        self._args = args
+
+    @property
+    def headers(self) -> MultiDict:
+        if self._headers is None:
+            self._headers = MultiDict()
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: MultiDict) -> None:
+        self._headers = headers
+
+    @property
+    def form(self) -> MultiDict:
+        if self._form is None:
+            self._form = MultiDict()
+        return self._form
+
+    @form.setter
+    def form(self, form: MultiDict) -> None:
+        self._form = form
 
     def __repr__(self):
         return f"{self.method} {self.path}"
@@ -1,17 +1,48 @@
 import json
 from http import HTTPStatus
 from http.cookies import SimpleCookie
-from typing import Annotated, Callable, Optional
+from typing import Annotated, Any, Callable, ClassVar, Dict, Optional, Union
 
 from typing_extensions import Doc
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from src.enums import MediaType
-from src.nanohttp import MultiDict
+from src.multidict import MultiDict
+
+
+_CONTENT_TYPE = f"{MediaType.HTML}; charset=utf-8"
+_PHRASE: Dict[int, str] = {status.value: status.phrase for status in HTTPStatus}
+_PHRASE_BYTES: Dict[int, bytes] = {k: v.encode() for k, v in _PHRASE.items()}
+
+
+# orjson reads integers past 64 bits as floats, e.g. ids of 30 digits lose precision.
+_loads: Callable[[Union[bytes, str]], Any] = orjson.loads if orjson else json.loads
+
+
+def _json_dumps(data: Any) -> bytes:
+    return json.dumps(data).encode()
+
+
+def _orjson_dumps(data: Any) -> bytes:
+    # `OPT_NON_STR_KEYS` keeps orjson on par with `json.dumps` for e.g. `{1: 2}`, and
+    # integers past 64 bits, which orjson rejects, are left to `json.dumps`.
+    try:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        return _json_dumps(data)
 
 
 class Response(Exception):
     """An HTTP Response. May be raised or returned at any time in middleware or route functions."""
 
+    _default_dumps: ClassVar[Callable[[Any], bytes]] = staticmethod(
+        _orjson_dumps if orjson else _json_dumps
+    )
+
     def __init__(
         self,
         status: Annotated[
@@ -32,45 +63,90 @@ class Response(Exception):
             Doc("Cookies to be set in the response. Defaults to None if not provided."),
         ] = None,
         body: Annotated[
-            Optional[bytes],
-            Doc("The body of the response. Defaults to an empty byte string."),
+            Union[bytes, str],
+            Doc(
+                "The body of the response, `str` bodies are encoded as UTF-8. Defaults to an empty byte string."
+            ),
         ] = b"",
         dumps: Annotated[
-            Callable,
+            Optional[Callable],
             Doc(
-                "Callable used to serialize data (e.g., `msgspec`, `orjson`, etc), defaults to `json.dumps`."
+                "Callable used to serialize data (e.g., `msgspec`, `orjson`, etc), defaults to `orjson.dumps` if installed, otherwise `json.dumps`. orjson sends `NaN` and infinities as `null`."
             ),
-        ] = json.dumps,
+        ] = None,
     ) -> None:
         self.status: HTTPStatus = status
-        try:
-            self.description = HTTPStatus(status).phrase
-        except ValueError:
-            self.description = ""
-        super().__init__(f"{self.status} {self.description}")
+        self.description = _PHRASE.get(status, "")
         self.headers = MultiDict(headers)
-        self.headers.setdefault("content-type", f"{MediaType.HTML}; charset=utf-8")
-        self.cookies = SimpleCookie(cookies)
-        self.body = body
-        self.dumps = dumps
+        self.headers.setdefault("content-type", _CONTENT_TYPE)
+        self._cookies = None if cookies is None else SimpleCookie(cookies)
+        self.body: bytes = body.encode() if isinstance(body, str) else body
+        self.dumps = dumps or self._default_dumps
+
+    def __str__(self) -> str:
+        # Built on demand rather than passed to `Exception.__init__`, most responses
+        # are returned, not raised, and never printed.
+        return f"{self.status} {self.description}"
+
+    @property
+    def cookies(self) -> SimpleCookie:
+        """
+        Cookies to be set in the response, created on first access.
+
+        Pre-serialized values can skip `SimpleCookie` by going straight to the headers:
+        `response.headers["set-cookie"] = "id=1; Path=/"`.
+        """
+        if self._cookies is None:
+            self._cookies = SimpleCookie()
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, cookies: SimpleCookie) -> None:
+        self._cookies = cookies
 
     @classmethod
-    def from_any(cls, any):
-        if isinstance(any, int):
-            return cls(status=any, body=HTTPStatus(any).phrase.encode())
-        elif isinstance(any, str):
-            return cls(status=HTTPStatus.OK, body=any.encode())
-        elif isinstance(any, bytes):
-            return cls(status=HTTPStatus.OK, body=any)
-        elif isinstance(any, dict):
-            return cls(
-                status=HTTPStatus.OK,
-                headers={"content-type": MediaType.JSON},
-                body=cls().dumps(any).encode(),
+    def from_any(cls, any, dumps: Optional[Callable] = None):
+        if (encoder := _BODY_ENCODERS.get(type(any))) is None:
+            if isinstance(any, cls):
+                return any
+            # `bool` is an `int` subclass, but `True` is no status code.
+            if isinstance(any, bool):
+                raise TypeError
+            encoder = next(
+                (e for k, e in _BODY_ENCODERS.items() if isinstance(any, k)), None
             )
-        elif isinstance(any, cls):
-            return any
-        elif any is None:
-            return cls(status=HTTPStatus.NO_CONTENT)
-        else:
-            raise TypeError
+            if encoder is None:
+                raise TypeError
+        return encoder(cls, any, dumps)
+
+
+def _from_status(cls, status, dumps):
+    return cls(status=status, body=_PHRASE_BYTES.get(status, b""))
+
+
+def _from_body(cls, body, dumps):
+    return cls(status=HTTPStatus.OK, body=body)
+
+
+def _from_data(cls, data, dumps):
+    return cls(
+        status=HTTPStatus.OK,
+        headers={"content-type": MediaType.JSON},
+        body=(dumps or cls._default_dumps)(data),
+    )
+
+
+def _from_none(cls, none, dumps):
+    return cls(status=HTTPStatus.NO_CONTENT)
+
+
+# How `Response.from_any` turns each return type into a response, looked up by exact
+# type first and by `isinstance` for subclasses.
+_BODY_ENCODERS: Dict[type, Callable[..., Response]] = {
+    int: _from_status,
+    HTTPStatus: _from_status,
+    str: _from_body,
+    bytes: _from_body,
+    dict: _from_data,
+    type(None): _from_none,
+}
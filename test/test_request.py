@@ -0,0 +1,236 @@
+import asyncio
+
+import pytest
+
+from src.multidict import MultiDict
+from src.nanohttp import Application, parse_cookies, pipeline
+from src.request import Request
+
+
+def serve(app, method="GET", query_string=b"", body=b"", headers=(), state=None):
+    seen, sent, received = [], [], []
+    app.route("/", methods=(method,))(lambda request: seen.append(request))
+
+    chunks = list(body) if isinstance(body, list) else [body]
+
+    async def receive():
+        chunk = chunks.pop(0)
+        received.append(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": "/",
+        "query_string": query_string,
+        "headers": list(headers),
+        "state": {} if state is None else state,
+    }
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], len(received), seen[0] if seen else None
+
+
+def echo(app, query_string=b"", body=b"", headers=()):
+    method = "POST" if body else "GET"
+    return serve(app, method, query_string, body, headers)[2]
+
+
+@pytest.mark.parametrize("query_string", [b"", b"x=1"])
+def test_args_can_be_written_with_and_without_query_string(query_string):
+    app = Application()
+
+    @app.before
+    def default_page(request):
+        request.args.setdefault("page", "1")
+        request.form["seen"] = "yes"
+
+    request = echo(app, query_string=query_string)
+
+    assert request.args["page"] == "1"
+    assert request.form["seen"] == "yes"
+
+
+def test_empty_fields_are_not_shared():
+    first, second = Request("GET", "/"), Request("GET", "/")
+    first.args["x"] = "1"
+    first.headers["x"] = "1"
+    first.form["x"] = "1"
+
+    assert isinstance(second.args, MultiDict)
+    assert second.args == second.headers == second.form == {}
+
+
+def test_params_is_a_plain_dict():
+    request = Request("GET", "/")
+    request.params["id"] = "1"
+
+    assert type(request.params) is dict
+    assert Request("GET", "/").params == {}
+
+
+def test_query_string_is_utf8():
+    request = echo(Application(), query_string="q=é&q=%C3%A9&r=100%25".encode())
+
+    assert request.args._get("q") == ["é", "é"]
+    assert request.args["r"] == "100%"
+
+
+def test_form_body_is_utf8():
+    request = echo(
+        Application(),
+        body="name=Zoë&city=%C3%89vry".encode(),
+        headers=[(b"content-type", b"application/x-www-form-urlencoded")],
+    )
+
+    assert request.form["name"] == "Zoë"
+    assert request.form["city"] == "Évry"
+
+
+@pytest.mark.parametrize(
+    "method, headers, receives",
+    [
+        ("GET", [], 0),
+        ("GET", [(b"content-length", b"0")], 0),
+        ("GET", [(b"content-length", b"2")], 1),
+        ("DELETE", [(b"transfer-encoding", b"chunked")], 1),
+        ("POST", [], 1),
+    ],
+)
+def test_body_is_only_received_when_announced(method, headers, receives):
+    status, received, _ = serve(Application(), method, headers=headers)
+
+    assert (status, received) == (204, receives)
+
+
+@pytest.mark.parametrize(
+    "length, status",
+    [(b"abc", 400), (b"-1", 400), (b"11", 413)],
+)
+def test_invalid_content_length_is_rejected_before_reading(length, status):
+    app = Application(max_content=10)
+
+    assert serve(app, "POST", headers=[(b"content-length", length)]) == (
+        status,
+        0,
+        None,
+    )
+
+
+def test_chunked_body_is_joined():
+    status, received, request = serve(
+        Application(), "POST", body=[b"ab", b"", b"cd", b"e"]
+    )
+
+    assert (status, received, request.body) == (204, 4, b"abcde")
+
+
+def test_chunked_body_over_max_content_stops_reading():
+    app = Application(max_content=4)
+
+    assert serve(app, "POST", body=[b"ab", b"cd", b"e", b"f"]) == (413, 3, None)
+
+
+@pytest.mark.parametrize(
+    "header, cookies",
+    [
+        ("", {}),
+        ("id=1", {"id": "1"}),
+        (" id = 1 ;theme=dark", {"id": "1", "theme": "dark"}),
+        ('name="quoted"; empty=; flag', {"name": "quoted", "empty": ""}),
+        ('one="', {"one": '"'}),
+    ],
+)
+def test_parse_cookies(header, cookies):
+    assert parse_cookies(header) == cookies
+
+
+def test_request_cookies_come_from_the_cookie_header():
+    request = echo(Application(), headers=[(b"cookie", b"id=1; theme=dark")])
+
+    assert request.cookies == {"id": "1", "theme": "dark"}
+
+
+def test_request_cookies_are_utf8():
+    request = echo(Application(), headers=[(b"cookie", 'n=é; q="Zoë"'.encode())])
+
+    assert request.cookies == {"n": "é", "q": "Zoë"}
+
+
+def test_state_writes_stay_in_the_request():
+    lifespan = {"db": "sqlite", "count": 0}
+    app = Application()
+
+    @app.before
+    def write(request):
+        request.state["user"] = "admin"
+        request.state["count"] += 1
+
+    first = serve(app, state=lifespan)[2]
+    second = serve(app, state=lifespan)[2]
+
+    assert first.state["count"] == second.state["count"] == 1
+    assert first.state["db"] == "sqlite"
+    assert lifespan == {"db": "sqlite", "count": 0}
+    with pytest.raises(KeyError):
+        del first.state["db"]
+    del first.state["user"]
+    assert "user" not in first.state
+
+
+def test_pipeline_groups_consecutive_sync_functions():
+    def a(request): ...
+    def b(request): ...
+    async def c(request): ...
+    def d(request): ...
+
+    assert pipeline([a, b, c, d]) == [[a, b], c, [d]]
+    assert pipeline([]) == []
+
+
+def test_hooks_run_in_order():
+    calls = []
+
+    async def second(request):
+        calls.append("second")
+
+    app = Application(
+        before=[
+            lambda request: calls.append("first"),
+            second,
+            lambda request: calls.append("third"),
+        ],
+        after=[lambda request, response: calls.append("after")],
+    )
+
+    serve(app)
+
+    assert calls == ["first", "second", "third", "after"]
+
+
+def test_truthy_before_hook_skips_later_hooks_and_handler():
+    calls = []
+
+    async def never(request):
+        calls.append("never")
+
+    app = Application(
+        before=[
+            lambda request: calls.append("first"),
+            lambda request: "stop",
+            lambda request: calls.append("skipped"),
+            never,
+        ],
+        after=[
+            lambda request, response: calls.append(response.body),
+            lambda request, response: 418,
+            lambda request, response: calls.append("skipped after"),
+        ],
+    )
+
+    status, _, request = serve(app)
+
+    assert (status, request) == (418, None)
+    assert calls == ["first", b"stop"]
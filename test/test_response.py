@@ -0,0 +1,54 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from src import response as response_module
+from src.response import Response
+
+DUMPS = [pytest.param(response_module._json_dumps, id="json")]
+if response_module.orjson is not None:
+    DUMPS.append(pytest.param(Response._default_dumps, id="orjson"))
+
+
+@pytest.fixture(params=DUMPS)
+def dumps(request, monkeypatch):
+    monkeypatch.setattr(Response, "_default_dumps", staticmethod(request.param))
+    return request.param
+
+
+def test_from_any_dict_is_json(dumps):
+    response = Response.from_any({"a": [1, 2]})
+
+    assert response.status == 200
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == {"a": [1, 2]}
+
+
+def test_from_any_dict_with_non_str_keys(dumps):
+    assert json.loads(Response.from_any({1: 2}).body) == {"1": 2}
+
+
+def test_default_dumps_on_instance(dumps):
+    assert json.loads(Response().dumps({"a": 1})) == {"a": 1}
+
+
+def test_from_any_dict_with_str_serializer():
+    response = Response.from_any({"a": 1}, lambda data: json.dumps(data))
+
+    assert response.body == b'{"a": 1}'
+
+
+@pytest.mark.parametrize("value", [True, False, 1.5, object()])
+def test_from_any_rejects_unsupported_types(value):
+    with pytest.raises(TypeError):
+        Response.from_any(value)
+
+
+def test_from_any_status_codes():
+    assert Response.from_any(201).body == b"Created"
+    assert Response.from_any(HTTPStatus.ACCEPTED).status == 202
+
+
+def test_from_any_dict_with_big_int(dumps):
+    assert json.loads(Response.from_any({"a": 2**70}).body) == {"a": 2**70}
@@ -0,0 +1,226 @@
+import asyncio
+from dataclasses import dataclass
+
+from src.nanohttp import Application
+from src.response import Response
+
+
+def serve(app, path, method="GET"):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [],
+    }
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def call(app, path, method="GET"):
+    start, body = serve(app, path, method)
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+def startup(app):
+    events = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return events.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(app({"type": "lifespan", "state": {}}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+def test_literal_pattern_and_missing_routes():
+    app = Application()
+
+    @app.get("/")
+    def index(request):
+        return "index"
+
+    @app.get(r"/users/(?P<id>\d+)")
+    def user(request):
+        return request.params["id"]
+
+    status, _, body = call(app, "/")
+    assert (status, body) == (200, b"index")
+    assert call(app, "/users/12")[2] == b"12"
+    assert call(app, "/users/ab")[0] == 404
+    assert call(app, "/missing")[0] == 404
+
+
+def test_method_not_allowed_lists_methods():
+    app = Application()
+    app.route("/items", methods=("GET", "POST"))(lambda request: "items")
+
+    status, headers, _ = call(app, "/items", method="DELETE")
+
+    assert status == 405
+    assert headers[b"allow"] == b"GET, POST"
+
+
+def test_literal_paths_take_precedence_over_patterns():
+    app = Application()
+    app.get("/(?P<page>.*)")(lambda request: "page")
+    app.get("/about")(lambda request: "about")
+
+    assert call(app, "/about")[2] == b"about"
+    assert call(app, "/contact")[2] == b"page"
+
+
+def test_patterns_keep_registration_order_across_buckets_and_alternation():
+    # `/users/...` is filed in the "users" bucket, `/(?P<page>...)` in the
+    # alternation; both match `/users/x`, the one registered first wins.
+    first = Application()
+    first.get("/(?P<page>[a-z]+)/x")(lambda request: "alternation")
+    first.get("/users/(?P<rest>.*)")(lambda request: "bucket")
+
+    second = Application()
+    second.get("/users/(?P<rest>.*)")(lambda request: "bucket")
+    second.get("/(?P<page>[a-z]+)/x")(lambda request: "alternation")
+
+    assert call(first, "/users/x")[2] == b"alternation"
+    assert call(first, "/users/y")[2] == b"bucket"
+    assert call(second, "/users/x")[2] == b"bucket"
+    assert call(second, "/abc/x")[2] == b"alternation"
+
+
+def test_alternatives_only_match_their_own_pattern():
+    app = Application()
+    app.get("/p|/q")(lambda request: "p or q")
+    app.get("/a/*b")(lambda request: "slashes")
+    app.get("/(?P<name>[a-z]+)z")(lambda request: request.params["name"])
+
+    assert call(app, "/q")[2] == b"p or q"
+    assert call(app, "/ab")[2] == b"slashes"
+    assert call(app, "/a//b")[2] == b"slashes"
+    assert call(app, "/fooz")[2] == b"foo"
+    assert call(app, "/pq")[0] == 404
+
+
+def test_colliding_group_names_fall_back_to_linear_scan():
+    app = Application()
+    app.get(r"/(?P<id>\d+)/a")(lambda request: "a" + request.params["id"])
+    app.get(r"/(?P<id>\w+)/b")(lambda request: "b" + request.params["id"])
+
+    assert call(app, "/1/a")[2] == b"a1"
+    assert call(app, "/x1/b")[2] == b"bx1"
+    assert call(app, "/x1/a")[0] == 404
+
+
+def test_numbered_backreferences_fall_back_to_linear_scan():
+    app = Application()
+    app.get(r"/(\w+)/\1")(lambda request: "twice")
+    app.get(r"/(?P<a>\w+)/(?P<b>\w+)")(lambda request: "pair")
+
+    assert call(app, "/foo/foo")[2] == b"twice"
+    assert call(app, "/foo/bar")[2] == b"pair"
+
+
+def test_routes_added_after_startup_are_matched():
+    app = Application()
+    app.get("/before")(lambda request: "before")
+    startup(app)
+    assert call(app, "/before")[2] == b"before"
+
+    app.get("/after")(lambda request: "after")
+    app.get(r"/later/(?P<id>\d+)")(lambda request: request.params["id"])
+
+    assert call(app, "/after")[2] == b"after"
+    assert call(app, "/later/3")[2] == b"3"
+    assert call(app, "/before")[2] == b"before"
+
+
+def test_new_methods_on_an_existing_route_are_matched():
+    app = Application()
+    app.get("/items")(lambda request: "get")
+    assert call(app, "/items", method="POST")[0] == 405
+
+    app.post("/items")(lambda request: "post")
+
+    assert call(app, "/items", method="POST")[2] == b"post"
+    assert call(app, "/items")[2] == b"get"
+
+
+def test_mount_with_prefix():
+    utils = Application()
+    utils.get("/ping")(lambda request: "pong")
+    utils.get(r"/item/(?P<id>\d+)")(lambda request: request.params["id"])
+
+    app = Application()
+    app.get("/")(lambda request: "index")
+    app.mount(utils, prefix="/utils")
+
+    assert call(app, "/utils/ping")[2] == b"pong"
+    assert call(app, "/utils/item/5")[2] == b"5"
+    assert call(app, "/ping")[0] == 404
+    assert call(app, "/")[2] == b"index"
+
+
+def test_mount_without_prefix_reuses_patterns():
+    utils = Application()
+    utils.get(r"/item/(?P<id>\d+)")(lambda request: request.params["id"])
+
+    app = Application()
+    app.mount(utils)
+
+    assert app._routes[0][0] is utils._routes[0][0]
+    assert call(app, "/item/7")[2] == b"7"
+
+
+def test_routes_from_constructor():
+    app = Application(
+        routes={
+            "/": {"GET": lambda request: "index"},
+            r"/users/(?P<id>\d+)": {"PUT": lambda request: request.params["id"]},
+        }
+    )
+
+    assert call(app, "/")[2] == b"index"
+    assert call(app, "/users/4", method="PUT")[2] == b"4"
+
+
+def test_sync_async_and_unhashable_handlers():
+    @dataclass
+    class Greeter:
+        greeting: str
+
+        def __call__(self, request):
+            return self.greeting
+
+    async def coroutine_handler(request):
+        return "async"
+
+    app = Application()
+    app.get("/sync")(lambda request: "sync")
+    app.get("/async")(coroutine_handler)
+    app.get("/dataclass")(Greeter("hello"))
+
+    assert call(app, "/sync")[2] == b"sync"
+    assert call(app, "/async")[2] == b"async"
+    assert call(app, "/dataclass")[2] == b"hello"
+
+
+def test_reused_response_sends_its_cookies_once():
+    shared = Response("ok", cookies={"id": "1"})
+    app = Application()
+    app.get("/")(lambda request: shared)
+
+    for _ in range(3):
+        start, _ = serve(app, "/")
+        cookies = [value for name, value in start["headers"] if name == b"set-cookie"]
+        assert cookies == [b"id=1"]
+    assert "set-cookie" not in shared.headers